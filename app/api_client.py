@@ -0,0 +1,85 @@
+import csv
+import io
+import os
+import re
+import sys
+from typing import List, Tuple
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Share the batch limit and query normalization with the API so they cannot drift
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from api_contract import MAX_BATCH_QUERIES, normalize_query
+
+# ============================================================
+# API CLIENT CONFIGURATION
+# ============================================================
+API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
+CONNECT_TIMEOUT = 3    # seconds per connection attempt (retried twice)
+READ_TIMEOUT = 30      # seconds waiting for the ranking; never retried
+CACHE_TTL = 60 * 60    # cached responses expire after an hour
+
+
+class BackendError(Exception):
+    pass
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled keep-alive session shared by every rerun and browser tab."""
+    session = requests.Session()
+    # Only failed connections are retried: a POST that timed out reading is not re-sent,
+    # so one click costs at most 3 x CONNECT_TIMEOUT + READ_TIMEOUT
+    retries = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.3, allowed_methods=None)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def split_job_descriptions(text: str) -> List[str]:
+    """Splits pasted text into job descriptions separated by blank lines, keeping their wording."""
+    return [block.strip() for block in re.split(r"\n\s*\n", text) if block.strip()]
+
+
+def _call(path: str, payload: dict) -> dict:
+    try:
+        res = get_session().post(f"{API_BASE_URL}{path}", json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    except requests.Timeout as e:
+        raise BackendError("Request timed out") from e
+    except requests.RequestException as e:
+        raise BackendError("Backend Offline") from e
+    if res.status_code == 503:
+        raise BackendError("Backend is starting up, try again shortly")
+    if res.status_code != 200:
+        raise BackendError(f"API Error ({res.status_code})")
+    return res.json()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_recommendations(query: str) -> List[dict]:
+    """Cached per query (pass it normalized); errors are raised and never cached."""
+    data = _call("/recommend", {"query": query})
+    return data.get("recommended_assessments", [])[:10]
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_batch_recommendations(queries: Tuple[str, ...]) -> List[List[dict]]:
+    data = _call("/recommend/batch", {"queries": list(queries)})
+    return [r.get("recommended_assessments", [])[:10] for r in data.get("results", [])]
+
+
+def history_csv(history: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> bytes:
+    """Renders the (query, urls) history as the submission CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["Query", "Assessment_url"])
+    for query, urls in history:
+        writer.writerows((query, url) for url in urls)
+    return buffer.getvalue().encode("utf-8")
@@ -1,19 +1,21 @@
 import streamlit as st
-import requests
 import re
-import pandas as pd
+
+from api_client import (
+    BackendError, MAX_BATCH_QUERIES, fetch_recommendations, fetch_batch_recommendations,
+    history_csv, normalize_query, split_job_descriptions
+)
 
 # ============================================================
 # 1. CONFIGURATION
 # ============================================================
-API_BASE_URL = "http://127.0.0.1:8000"
-
 st.set_page_config(page_title="SHL Intelligent Recommender", page_icon="🧠", layout="wide")
 
 # Initialize Session State
-if 'submission_history' not in st.session_state: st.session_state.submission_history = []
+# submission_history maps query -> tuple of URLs (insertion ordered, one entry per query)
+# results is a list of (query, assessments) pairs, one per submitted job description
+if 'submission_history' not in st.session_state: st.session_state.submission_history = {}
 if 'results' not in st.session_state: st.session_state.results = []
-if 'query' not in st.session_state: st.session_state.query = ""
 
 # ============================================================
 # 2. STYLING & HELPER FUNCTIONS
@@ -69,37 +71,42 @@ with t1:
     with l:
         st.subheader("Hiring Requirements")
         q_input = st.text_area("Job Description:", height=150, placeholder="e.g. Hiring a Java Developer...")
+        batch_mode = st.checkbox("Several job descriptions (separate them with a blank line)")
         
         if st.button("🚀 Find Matches", type="primary", use_container_width=True):
-            if not q_input.strip(): st.warning("Enter a query first.")
+            # Raw text goes into the CSV; only the API call and cache key are normalized
+            queries = split_job_descriptions(q_input) if batch_mode else [q_input]
+            queries = [q for q in queries if normalize_query(q)]
+            if not queries: st.warning("Enter a query first.")
+            elif len(queries) > MAX_BATCH_QUERIES: st.warning(f"Paste at most {MAX_BATCH_QUERIES} job descriptions.")
             else:
                 try:
-                    res = requests.post(f"{API_BASE_URL}/recommend", json={"query": q_input})
-                    if res.status_code == 200:
-                        current_results = res.json().get("recommended_assessments", [])[:10]
-                        st.session_state.results = current_results
-                        st.session_state.query = q_input
-                        for item in current_results:
-                            st.session_state.submission_history.append({
-                                "Query": q_input, "Assessment_url": item['url']
-                            })
-                        st.success(f"Matches found & added to CSV.")
-                    else: st.error("API Error")
-                except: st.error("Backend Offline")
+                    api_queries = tuple(normalize_query(q) for q in queries)
+                    with st.spinner("Ranking assessments..."):
+                        if len(queries) == 1:
+                            batches = [fetch_recommendations(api_queries[0])]
+                        else:
+                            batches = fetch_batch_recommendations(api_queries)
+                    st.session_state.results = list(zip(queries, batches))
+                    for query, items in st.session_state.results:
+                        st.session_state.submission_history[query] = tuple(item['url'] for item in items)
+                    st.success(f"Matches found & added to CSV.")
+                except BackendError as e: st.error(str(e))
 
         st.divider()
         if st.session_state.submission_history:
-            df = pd.DataFrame(st.session_state.submission_history)
-            st.caption(f"Total Rows: {len(df)}")
-            st.download_button("📩 Download Sumit_Sharma.csv", df.to_csv(index=False).encode('utf-8'), "Sumit_Sharma.csv", "text/csv", use_container_width=True)
+            history = tuple(st.session_state.submission_history.items())
+            st.caption(f"Total Rows: {sum(len(urls) for _, urls in history)}")
+            st.download_button("📩 Download Sumit_Sharma.csv", history_csv(history), "Sumit_Sharma.csv", "text/csv", use_container_width=True)
             if st.button("Reset History", use_container_width=True):
-                st.session_state.submission_history = []
+                st.session_state.submission_history = {}
                 st.rerun()
 
     with r:
-        if st.session_state.results:
-            st.caption(f"Top {len(st.session_state.results)} Matches")
-            for i, item in enumerate(st.session_state.results, 1):
+        for query, items in st.session_state.results:
+            if len(st.session_state.results) > 1: st.markdown(f"**{query[:120]}**")
+            st.caption(f"Top {len(items)} Matches")
+            for i, item in enumerate(items, 1):
                 m = parse_metadata(item)
                 types = "".join([f"<span class='tech-badge' style='font-size:10px; padding:2px 8px;'>{TEST_TYPE_MAP.get(t, t)}</span>" for t in item.get("test_type", [])])
                 st.markdown(f"""
@@ -1,11 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Union
 import os
 import sys
+import asyncio
 import logging
-import re
 import time
 
 # ============================================================
@@ -22,9 +24,12 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SHL-API")
 
 try:
-    from retriever import IntelligentSearcher
+    from catalogs import CatalogRegistry, CatalogNotFoundError, DEFAULT_CATALOG
+    from serialization import AssessmentItem, ProjectedAssessmentItem, RESPONSE_FIELDS, join_array, normalize_fields
+    from api_contract import MAX_BATCH_QUERIES, normalize_query
+    from singleflight import SingleFlight
 except Exception as e:
-    logger.error(f"❌ Failed to import IntelligentSearcher: {e}")
+    logger.error(f"❌ Failed to import CatalogRegistry: {e}")
     sys.exit(1)
 
 # ============================================================
@@ -43,67 +48,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-search_engine: Optional[IntelligentSearcher] = None
+# Brotli via brotli-asgi (it still serves gzip to other clients); gzip only if it is missing
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=500)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+
+catalog_registry: Optional[CatalogRegistry] = None
+
+# Concurrent identical searches share one computation; resized from the runtime profile at startup
+search_flights = SingleFlight()
 
 @app.on_event("startup")
 async def startup_event():
-    global search_engine
-    logger.info("🚀 Starting up IntelligentSearcher...")
+    global catalog_registry, search_flights
+    logger.info("🚀 Starting up CatalogRegistry...")
     
     if not os.path.exists(DATA_PATH):
         logger.error(f"FATAL: {DATA_PATH} not found. Ensure test_catalog.json is in GitHub root.")
         return
 
     try:
-        search_engine = IntelligentSearcher()
-        logger.info("✅ IntelligentSearcher initialized successfully.")
+        registry = CatalogRegistry()
+        # Warm the default catalog so the first request does not pay for loading
+        registry.get(DEFAULT_CATALOG)
+        search_flights = SingleFlight(max_workers=(registry.profile or {}).get("inference_workers", 1))
+        catalog_registry = registry
+        logger.info("✅ CatalogRegistry initialized successfully.")
     except Exception as e:
         logger.error(f"❌ Initialization failed: {str(e)}")
-        search_engine = None
+        catalog_registry = None
 
 # ============================================================
 # MODELS (Strictly matching Appendix 2 & OAS 3.1) 
 # ============================================================
+class PreSerializedJSONResponse(JSONResponse):
+    """Body is already-encoded JSON built from cached fragments; documented via response_model."""
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
 class QueryRequest(BaseModel):
     query: str = Field(..., min_length=2, description="Job description or role query")
-
-class AssessmentItem(BaseModel):
-    url: str               # 
-    name: str              # 
-    adaptive_support: str  #  - Either "Yes" or "No"
-    description: str       # 
-    duration: int          #  - Integer
-    remote_support: str    #  - Either "Yes" or "No"
-    test_type: List[str]   #  - Array of Strings
+    catalog: str = Field(DEFAULT_CATALOG, description="Name of the catalog to search")
 
 class RecommendationResponse(BaseModel):
     recommended_assessments: List[AssessmentItem]
 
-# ============================================================
-# DATA CLEANING UTIL
-# ============================================================
-def clean_assessment_data(item: dict) -> dict:
-    """Standardizes response fields to match SHL requirements exactly."""
-    raw_desc = item.get("description", "") or ""
-
-    # Extract duration as Integer 
-    duration_match = re.search(r"Time in minutes\s*=\s*(\d+)", raw_desc, re.I)
-    duration = int(duration_match.group(1)) if duration_match else int(item.get("duration", 45))
-
-    # Standardize Yes/No strings 
-    def to_yes_no(val):
-        if str(val).lower() in ['yes', 'true', '1']: return "Yes"
-        return "No"
-
-    return {
-        "url": item.get("url", ""),
-        "name": item.get("name", "Assessment"),
-        "adaptive_support": to_yes_no(item.get("adaptive_support", "No")),
-        "description": raw_desc.strip(),
-        "duration": duration,
-        "remote_support": to_yes_no(item.get("remote_support", "Yes")),
-        "test_type": item.get("test_type", ["Knowledge & Skills"])
-    }
+class ProjectedRecommendationResponse(BaseModel):
+    recommended_assessments: List[ProjectedAssessmentItem]
+
+# Full items by default; only the requested keys when ?fields= is given
+RecommendationResult = Union[RecommendationResponse, ProjectedRecommendationResponse]
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(..., description=f"Up to {MAX_BATCH_QUERIES} job descriptions")
+    catalog: str = Field(DEFAULT_CATALOG, description="Name of the catalog to search")
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResult]
 
 # ============================================================
 # ROUTES [cite: 154]
@@ -111,20 +115,78 @@ def clean_assessment_data(item: dict) -> dict:
 @app.get("/health") # [cite: 155]
 async def health_check():
     """Health check returns status: healthy """
-    if search_engine:
-        return {"status": "healthy"}
+    if catalog_registry:
+        # stats() lists the catalogs directory; keep that file I/O off the event loop
+        catalogs = await asyncio.get_running_loop().run_in_executor(None, catalog_registry.stats)
+        return {
+            "status": "healthy",
+            "catalogs": catalogs,
+            "runtime_profile": catalog_registry.profile,
+            "single_flight": search_flights.stats(),
+        }
     raise HTTPException(status_code=503, detail="Search engine not ready")
 
-@app.post("/recommend", response_model=RecommendationResponse) # [cite: 163]
-async def recommend_assessments(request: QueryRequest):
-    """Returns ranked list of 1 to 10 assessments [cite: 163]"""
-    if not search_engine:
+async def get_search_engine(catalog: str):
+    if not catalog_registry:
         raise HTTPException(status_code=503, detail="Search engine initializing")
 
+    search_engine = catalog_registry.peek(catalog)
+    if search_engine is not None:
+        return search_engine
+
+    try:
+        # Cold loads read the index and build fragments; keep them off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, catalog_registry.get, catalog)
+    except CatalogNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog '{catalog}'")
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    try:
+        return normalize_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def search_ids(search_engine, catalog: str, query: str, top_k: int = 10) -> List[int]:
+    """Runs the search off the event loop, coalescing identical in-flight requests."""
+    query = normalize_query(query)
+    return await search_flights.do((catalog, query, top_k), search_engine.search_ids, query, top_k)
+
+FIELDS_DESCRIPTION = f"Comma-separated subset of {', '.join(RESPONSE_FIELDS)}, e.g. url,name"
+
+@app.post("/recommend", response_model=RecommendationResult, response_class=PreSerializedJSONResponse) # [cite: 163]
+async def recommend_assessments(request: QueryRequest, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    """Returns ranked list of 1 to 10 assessments [cite: 163]"""
+    projection = parse_fields(fields)
+    search_engine = await get_search_engine(request.catalog)
+
     try:
         # Requesting top_k results between 5 and 10 [cite: 45]
-        results = search_engine.search(request.query, top_k=10)
-        return {"recommended_assessments": [clean_assessment_data(i) for i in results]}
+        ids = await search_ids(search_engine, request.catalog, request.query, top_k=10)
+        body = join_array("recommended_assessments", search_engine.render(ids, projection))
+        return PreSerializedJSONResponse(content=body)
     except Exception as e:
         logger.error(f"Search error: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/recommend/batch", response_model=BatchRecommendationResponse, response_class=PreSerializedJSONResponse)
+async def recommend_assessments_batch(request: BatchQueryRequest, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    """Runs /recommend for several job descriptions in one round trip"""
+    queries = [q.strip() for q in request.queries]
+    if not queries or len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=422, detail=f"Send between 1 and {MAX_BATCH_QUERIES} queries")
+    if any(len(q) < 2 for q in queries):
+        raise HTTPException(status_code=422, detail="Each query needs at least 2 characters")
+
+    projection = parse_fields(fields)
+    search_engine = await get_search_engine(request.catalog)
+
+    try:
+        bodies = []
+        for q in queries:
+            ids = await search_ids(search_engine, request.catalog, q, top_k=10)
+            bodies.append(join_array("recommended_assessments", search_engine.render(ids, projection)))
+        return PreSerializedJSONResponse(content=join_array("results", bodies))
+    except Exception as e:
+        logger.error(f"Batch search error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,12 @@
+import re
+
+# ============================================================
+# LIMITS & QUERY NORMALIZATION SHARED BY THE API AND THE UI
+# ============================================================
+# Most job descriptions accepted by one /recommend/batch call
+MAX_BATCH_QUERIES = 20
+
+
+def normalize_query(query: str) -> str:
+    """Collapses whitespace; used for request coalescing and client-side cache keys."""
+    return re.sub(r"\s+", " ", query).strip()
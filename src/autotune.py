@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import platform
+import logging
+import statistics
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Sequence
+
+import torch
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, workers may tune concurrently
+    fcntl = None
+
+# ============================================================
+# AUTOTUNE SETTINGS
+# ============================================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+
+PROFILE_PATH = os.getenv("TORCH_PROFILE_PATH", os.path.join(PROJECT_ROOT, "torch_profile.json"))
+# Set TORCH_AUTOTUNE=0 to skip benchmarking (an existing profile is still reused)
+AUTOTUNE_ENABLED = os.getenv("TORCH_AUTOTUNE", "1") != "0"
+
+# Only the reranker sees a real batch (30 pairs); the retriever encodes one query per request
+RERANK_BATCH_SIZES = (8, 16, 32)
+# Requests are served one model call at a time, so inter-op parallelism only adds contention
+INTEROP_THREADS = 1
+# Concurrent model calls per worker process; each already uses the tuned intra-op threads
+INFERENCE_WORKERS = 1
+BENCHMARK_REPEATS = 3
+# Fewer threads win when within this fraction of the fastest setting
+THREAD_TOLERANCE = 0.05
+
+BENCHMARK_QUERIES = [
+    "I am hiring for Java developers who can also collaborate effectively with my business teams.",
+    "Looking to hire mid-level professionals who are proficient in Python, SQL and Java Script.",
+    "Graduate sales trainee with strong negotiation skills",
+    "Customer service representative for a call center environment",
+    "Project Manager with Agile and Scrum certification",
+    "Mechanical Engineer proficient in CAD",
+    "HR Manager with focus on recruitment strategy",
+    "Senior Accountant with knowledge of international tax law",
+]
+# Matches the 30 candidates the searcher sends to the cross-encoder
+BENCHMARK_PAIRS = 30
+BENCHMARK_DOCUMENT = (
+    "Title: Sample Assessment\nType: Knowledge & Skills\nLevel: Mid-Professional\n"
+    "Description: Measures the knowledge and practical skills needed for the role, "
+    "including problem solving, communication and collaboration with business teams."
+)
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def thread_budget() -> int:
+    """Cores per worker process, so uvicorn workers do not oversubscribe the host."""
+    raw = os.getenv("WEB_CONCURRENCY", "1")
+    try:
+        workers = max(1, int(raw))
+    except ValueError:
+        logging.warning(f"⚠️ Ignoring invalid WEB_CONCURRENCY={raw!r}, assuming 1 worker")
+        workers = 1
+    return max(1, available_cores() // workers)
+
+
+def thread_candidates(budget: int) -> List[int]:
+    candidates = {budget}
+    threads = 1
+    while threads < budget:
+        candidates.add(threads)
+        threads *= 2
+    return sorted(candidates)
+
+
+def cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def fingerprint(model_names: Sequence[str]) -> Dict[str, Any]:
+    # No hostname: containers get a new one on every deploy, which would force re-tuning
+    return {
+        "cpu": cpu_model(),
+        "cores": available_cores(),
+        "thread_budget": thread_budget(),
+        "torch": torch.__version__,
+        "models": list(model_names),
+    }
+
+
+def load_profile(model_names: Sequence[str], path: str = PROFILE_PATH) -> Optional[Dict[str, Any]]:
+    """Returns the saved profile if it was tuned for this hardware and these models."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Ignoring unreadable torch profile {path}: {e}")
+        return None
+    return profile if profile.get("fingerprint") == fingerprint(model_names) else None
+
+
+def apply_torch_threads(profile: Optional[Dict[str, Any]]):
+    """
+    Applies process-wide thread settings once; call before the first model runs.
+
+    torch.set_num_threads is global, so the larger per-model count is used for
+    both models rather than switching it per call.
+    """
+    if not profile:
+        return
+    _set_interop_threads(profile["interop_threads"])
+    threads = [m["threads"] for m in profile.get("models", {}).values()]
+    if threads:
+        torch.set_num_threads(max(threads))
+
+
+def _set_interop_threads(threads: int):
+    try:
+        if torch.get_num_interop_threads() != threads:
+            torch.set_num_interop_threads(threads)
+    except RuntimeError:
+        # Inter-op threads can only be set before any parallel work has started
+        pass
+
+
+def _time_call(fn) -> float:
+    timings = []
+    for _ in range(BENCHMARK_REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _pick(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    fastest = min(r["latency_ms"] for r in results)
+    good_enough = [r for r in results if r["latency_ms"] <= fastest * (1 + THREAD_TOLERANCE)]
+    return min(good_enough, key=lambda r: (r["threads"], r["latency_ms"]))
+
+
+def benchmark(retriever, reranker) -> Dict[str, Dict[str, Any]]:
+    """Times the served workloads: single-query encode latency and one 30-pair rerank."""
+    pairs = [[BENCHMARK_QUERIES[i % len(BENCHMARK_QUERIES)], BENCHMARK_DOCUMENT] for i in range(BENCHMARK_PAIRS)]
+
+    def encode_each(_):
+        for query in BENCHMARK_QUERIES:
+            retriever.encode([query], convert_to_numpy=True, normalize_embeddings=True)
+
+    workloads = {
+        # (run(batch_size), batch sizes to try, calls per run)
+        "retriever": (encode_each, (None,), len(BENCHMARK_QUERIES)),
+        "reranker": (lambda b: reranker.predict(pairs, batch_size=b), RERANK_BATCH_SIZES, 1),
+    }
+
+    chosen = {}
+    for model, (run, batch_sizes, calls) in workloads.items():
+        results = []
+        for threads in thread_candidates(thread_budget()):
+            torch.set_num_threads(threads)
+            for batch_size in batch_sizes:
+                run(batch_size)  # warm-up
+                latency = _time_call(lambda: run(batch_size)) * 1000 / calls
+                result = {"threads": threads, "latency_ms": round(latency, 3)}
+                if batch_size is not None:
+                    result["batch_size"] = batch_size
+                results.append(result)
+        chosen[model] = _pick(results)
+        logging.info(f"⚙️ {model}: {chosen[model]}")
+    return chosen
+
+
+@contextmanager
+def _profile_lock(path: str):
+    """Lets one worker tune while the others wait, so benchmarks do not contend."""
+    if fcntl is None:
+        yield
+        return
+    try:
+        lock = open(path + ".lock", "w")
+    except OSError as e:
+        # Read-only deployments still start; workers may just tune concurrently
+        logging.warning(f"⚠️ Could not create torch profile lock next to {path}: {e}")
+        yield
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_or_tune(retriever, reranker, model_names: Sequence[str], path: str = PROFILE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Returns the runtime profile for this hardware, benchmarking and saving one if needed.
+
+    GPU hosts are not tuned; torch thread settings only matter on CPU.
+    """
+    if str(retriever.device) != "cpu":
+        return None
+
+    # Fix inter-op threads before the benchmark starts any parallel work
+    _set_interop_threads(INTEROP_THREADS)
+
+    with _profile_lock(path):
+        profile = load_profile(model_names, path)
+        if profile is not None:
+            logging.info(f"⚙️ Reusing torch profile from {path}")
+        elif AUTOTUNE_ENABLED:
+            logging.info(f"⚙️ Tuning torch threads (budget {thread_budget()} cores)...")
+            profile = {
+                "fingerprint": fingerprint(model_names),
+                "interop_threads": INTEROP_THREADS,
+                "inference_workers": INFERENCE_WORKERS,
+                "models": benchmark(retriever, reranker),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(profile, f, indent=2)
+            except OSError as e:
+                logging.warning(f"⚠️ Could not save torch profile to {path}: {e}")
+
+    apply_torch_threads(profile)
+    return profile
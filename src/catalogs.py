@@ -0,0 +1,157 @@
+import os
+import re
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+from autotune import load_or_tune
+from retriever import IntelligentSearcher, load_models, MODEL_NAMES, PROJECT_ROOT, DEFAULT_VECTOR_DB, DEFAULT_METADATA
+
+# ============================================================
+# CATALOG LAYOUT
+# ============================================================
+# "default" is the index/metadata pair in the project root. Every other
+# catalog lives in its own folder: catalogs/<name>/vector_store.faiss + metadata.pkl
+DEFAULT_CATALOG = "default"
+CATALOGS_DIR = os.getenv("CATALOGS_DIR", os.path.join(PROJECT_ROOT, "catalogs"))
+CATALOG_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Residency budget: catalogs are evicted least-recently-used first. Bytes are the
+# estimated in-memory size of each catalog's index, metadata and response fragments;
+# memory-mapped re-score sidecars are reported as mapped_bytes but not budgeted.
+MAX_RESIDENT_CATALOGS = int(os.getenv("MAX_RESIDENT_CATALOGS", "8"))
+MAX_RESIDENT_BYTES = int(os.getenv("MAX_RESIDENT_BYTES", str(1024 ** 3)))
+
+
+class CatalogNotFoundError(KeyError):
+    pass
+
+
+class CatalogRegistry:
+    """
+    Serves several named catalogs from one process.
+
+    The retriever and reranker models are loaded once and shared; only each
+    catalog's index and metadata are loaded on demand, and cold catalogs are
+    evicted under a count/byte budget.
+    """
+
+    def __init__(
+        self,
+        catalogs_dir: str = CATALOGS_DIR,
+        max_resident: int = MAX_RESIDENT_CATALOGS,
+        max_bytes: int = MAX_RESIDENT_BYTES,
+    ):
+        self.catalogs_dir = catalogs_dir
+        self.max_resident = max_resident
+        self.max_bytes = max_bytes
+
+        self.retriever, self.reranker = load_models()
+        # Thread/batch settings for this host, benchmarked once and reused on later starts
+        self.profile = load_or_tune(self.retriever, self.reranker, MODEL_NAMES)
+
+        self._resident: "OrderedDict[str, IntelligentSearcher]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-catalog locks so a slow load does not block other catalogs
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def paths(self, name: str) -> Tuple[str, str]:
+        if name == DEFAULT_CATALOG:
+            return DEFAULT_VECTOR_DB, DEFAULT_METADATA
+        if not CATALOG_NAME_PATTERN.match(name):
+            raise CatalogNotFoundError(name)
+        folder = os.path.join(self.catalogs_dir, name)
+        return os.path.join(folder, "vector_store.faiss"), os.path.join(folder, "metadata.pkl")
+
+    def available(self) -> list:
+        names = [DEFAULT_CATALOG] if os.path.exists(DEFAULT_VECTOR_DB) else []
+        if os.path.isdir(self.catalogs_dir):
+            names += sorted(
+                name for name in os.listdir(self.catalogs_dir)
+                if CATALOG_NAME_PATTERN.match(name) and all(os.path.exists(p) for p in self.paths(name))
+            )
+        return names
+
+    def peek(self, name: str):
+        """Returns the searcher if the catalog is already resident, without loading it."""
+        with self._lock:
+            searcher = self._resident.get(name)
+            if searcher is not None:
+                self._resident.move_to_end(name)
+            return searcher
+
+    def get(self, name: str = DEFAULT_CATALOG) -> IntelligentSearcher:
+        """Returns the searcher for a catalog, loading it (and evicting cold ones) if needed. Blocking."""
+        searcher = self.peek(name)
+        if searcher is not None:
+            return searcher
+
+        # Validate before creating a load lock, so unknown names cannot grow _load_locks
+        vector_db_path, metadata_path = self.paths(name)
+        if not os.path.exists(vector_db_path) or not os.path.exists(metadata_path):
+            raise CatalogNotFoundError(name)
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another request may have finished loading while we waited
+            searcher = self.peek(name)
+            if searcher is not None:
+                return searcher
+
+            logging.info(f"📂 Loading catalog '{name}'")
+            searcher = IntelligentSearcher(
+                vector_db_path,
+                metadata_path,
+                retriever=self.retriever,
+                reranker=self.reranker,
+                profile=self.profile or {},
+            )
+
+            with self._lock:
+                self._resident[name] = searcher
+                self.loads += 1
+                self._evict(keep=name)
+            return searcher
+
+    def _evict(self, keep: str):
+        """Drops least-recently-used catalogs until the budget is met. Caller holds the lock."""
+        while len(self._resident) > 1 and (
+            len(self._resident) > self.max_resident or self.resident_bytes > self.max_bytes
+        ):
+            name = next(iter(self._resident))
+            if name == keep:
+                break
+            self._resident.pop(name)
+            load_lock = self._load_locks.get(name)
+            if load_lock is not None and not load_lock.locked():
+                del self._load_locks[name]
+            self.evictions += 1
+            logging.info(f"🧹 Evicted catalog '{name}'")
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(s.nbytes for s in self._resident.values())
+
+    @property
+    def mapped_bytes(self) -> int:
+        return sum(s.mapped_bytes for s in self._resident.values())
+
+    def stats(self) -> Dict[str, Any]:
+        available = self.available()
+        with self._lock:
+            return {
+                "available": available,
+                "resident": list(self._resident),
+                "resident_bytes": self.resident_bytes,
+                "mapped_bytes": self.mapped_bytes,
+                "max_resident": self.max_resident,
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "query_cache": {name: s.query_cache.stats() for name, s in self._resident.items()},
+            }
@@ -1,11 +1,15 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from config import LLM_MODEL, DEVICE
-from retriever import IntelligentSearcher
+from autotune import apply_torch_threads, load_profile
+from retriever import IntelligentSearcher, MODEL_NAMES
 
 
 class RAGPipeline:
     def __init__(self):
+        # Reuse the thread settings tuned by the API on this host, if any
+        apply_torch_threads(load_profile(MODEL_NAMES))
+
         # Initialize retriever
         self.search_engine = IntelligentSearcher()
 
@@ -1,11 +1,16 @@
+import argparse
 import json
 import pickle
 import os
+import time
 import faiss
 import torch
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from typing import Dict
+from typing import Dict, List, Optional
+
+from rescoring import RESCORE_FACTOR, full_embeddings_path, rescore_shortlist
+from serialization import FRAGMENT_VERSION, build_fragments
 
 DATA_DIR = r"D:\REA\data"
 INPUT_FILE = os.path.join(DATA_DIR, "test_catalog.json")
@@ -14,6 +19,40 @@ METADATA_FILE = os.path.join(DATA_DIR, "metadata.pkl")
 
 MODEL_NAME = "all-mpnet-base-v2"
 
+# ============================================================
+# COMPRESSED STORAGE SETTINGS
+# ============================================================
+# "float32" keeps the original flat index. "float16" / "int8" store
+# scalar-quantized codes; an optional PCA step reduces dimension first.
+STORAGE_DTYPES = ("float32", "float16", "int8")
+SQ_TYPES = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# (pca_dim, dtype) combinations measured by --report
+REPORT_SETTINGS = [
+    (None, "float32"),
+    (None, "float16"),
+    (None, "int8"),
+    (384, "float32"),
+    (384, "float16"),
+    (384, "int8"),
+    (128, "int8"),
+]
+REPORT_QUERIES = [
+    "I am hiring for Java developers who can also collaborate effectively with my business teams.",
+    "Looking to hire mid-level professionals who are proficient in Python, SQL and Java Script.",
+    "I am hiring for an analyst and wants applications to screen using Cognitive and personality tests",
+    "Graduate sales trainee with strong negotiation skills",
+    "Customer service representative for a call center environment",
+    "Project Manager with Agile and Scrum certification",
+    "Mechanical Engineer proficient in CAD",
+    "HR Manager with focus on recruitment strategy",
+    "Senior Accountant with knowledge of international tax law",
+]
+REPORT_TOP_K = 30
+
 
 def create_rich_context(item: Dict) -> str:
     name = item.get("name", "Unknown Assessment")
@@ -32,7 +71,115 @@ def create_rich_context(item: Dict) -> str:
     )
 
 
+def build_index(embeddings: np.ndarray, pca_dim: Optional[int] = None, dtype: str = "float32"):
+    """
+    Builds an inner-product index over normalized embeddings.
+
+    With pca_dim set, a PCA + re-normalization transform is stored inside the
+    index (IndexPreTransform), so query vectors are projected the same way
+    automatically at search time.
+    """
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}', expected one of {STORAGE_DTYPES}")
+
+    dimension = embeddings.shape[1]
+    if pca_dim is not None and not 0 < pca_dim < dimension:
+        raise ValueError(f"pca_dim must be between 1 and {dimension - 1}")
+    if pca_dim is not None and pca_dim > len(embeddings):
+        # faiss cannot output more PCA components than there are training vectors
+        raise ValueError(f"pca_dim must not exceed the number of documents ({len(embeddings)})")
+
+    index_dim = pca_dim or dimension
+    if dtype == "float32":
+        index = faiss.IndexFlatIP(index_dim)
+    else:
+        index = faiss.IndexScalarQuantizer(index_dim, SQ_TYPES[dtype], faiss.METRIC_INNER_PRODUCT)
+
+    if pca_dim is not None:
+        pca = faiss.PCAMatrix(dimension, pca_dim)
+        index = faiss.IndexPreTransform(faiss.NormalizationTransform(pca_dim), index)
+        index.prepend_transform(pca)
+
+    index.train(embeddings)
+    index.add(embeddings)
+    return index
+
+
+def is_compressed(pca_dim: Optional[int], dtype: str) -> bool:
+    return pca_dim is not None or dtype != "float32"
+
+
+def search_index(index, query_vecs: np.ndarray, top_k: int, full_embeddings: Optional[np.ndarray] = None) -> np.ndarray:
+    """Searches an index, re-scoring the shortlist when full embeddings are given."""
+    if full_embeddings is None:
+        _, indices = index.search(query_vecs, top_k)
+        return indices
+
+    _, shortlist = index.search(query_vecs, top_k * RESCORE_FACTOR)
+    results = np.full((len(query_vecs), top_k), -1, dtype=np.int64)
+    for i, query_vec in enumerate(query_vecs):
+        ranked = rescore_shortlist(full_embeddings, query_vec, shortlist[i], top_k)
+        results[i, :len(ranked)] = ranked
+    return results
+
+
+def report(embeddings: np.ndarray, query_vecs: np.ndarray) -> List[Dict]:
+    """Prints index size, search latency and recall loss for each storage setting."""
+    top_k = min(REPORT_TOP_K, len(embeddings))
+    baseline = faiss.IndexFlatIP(embeddings.shape[1])
+    baseline.add(embeddings)
+    _, exact = baseline.search(query_vecs, top_k)
+
+    rows = []
+    for pca_dim, dtype in REPORT_SETTINGS:
+        if pca_dim is not None and (pca_dim >= embeddings.shape[1] or pca_dim > len(embeddings)):
+            continue
+
+        index = build_index(embeddings, pca_dim, dtype)
+        size = len(faiss.serialize_index(index))
+        rescore = embeddings if is_compressed(pca_dim, dtype) else None
+
+        start = time.perf_counter()
+        found = search_index(index, query_vecs, top_k, rescore)
+        latency_ms = (time.perf_counter() - start) * 1000 / len(query_vecs)
+
+        recall = np.mean([
+            len(set(found[i]) & set(exact[i])) / top_k
+            for i in range(len(query_vecs))
+        ])
+        rows.append({
+            "pca_dim": pca_dim or embeddings.shape[1],
+            "dtype": dtype,
+            "index_bytes": size,
+            "latency_ms": latency_ms,
+            "recall": float(recall),
+        })
+
+    print(f"{'dim':>5} {'dtype':>8} {'index KB':>10} {'ms/query':>9} {f'recall@{top_k}':>10}")
+    for row in rows:
+        print(
+            f"{row['pca_dim']:>5} {row['dtype']:>8} {row['index_bytes'] / 1024:>10.1f} "
+            f"{row['latency_ms']:>9.3f} {row['recall']:>10.3f}"
+        )
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the FAISS vector store and metadata.")
+    parser.add_argument(
+        "--pca-dim", type=int, default=None,
+        help="Reduce embeddings to this dimension with PCA (at most the number of documents). "
+             "The stored PCA matrix is dim x 768 floats, so on small catalogs (a few hundred "
+             "documents) it outweighs the saved codes and the index gets larger; check --report first."
+    )
+    parser.add_argument("--dtype", choices=STORAGE_DTYPES, default="float32", help="Storage precision of the index")
+    parser.add_argument("--report", action="store_true", help="Compare storage settings instead of writing the index")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+
     if not os.path.exists(INPUT_FILE):
         return
 
@@ -65,14 +212,28 @@ def main():
         normalize_embeddings=True
     )
 
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)
-    index.add(embeddings)
+    if args.report:
+        query_vecs = model.encode(REPORT_QUERIES, convert_to_numpy=True, normalize_embeddings=True)
+        report(embeddings, query_vecs)
+        return
 
+    index = build_index(embeddings, args.pca_dim, args.dtype)
     faiss.write_index(index, VECTOR_DB_FILE)
 
+    index_config = {"pca_dim": args.pca_dim, "dtype": args.dtype, "rescore": False}
+    if is_compressed(args.pca_dim, args.dtype):
+        embeddings_file = full_embeddings_path(VECTOR_DB_FILE)
+        np.save(embeddings_file, embeddings.astype(np.float32))
+        index_config.update(rescore=True, full_embeddings=os.path.basename(embeddings_file))
+
     with open(METADATA_FILE, "wb") as f:
-        pickle.dump({"metadata": metadata}, f)
+        pickle.dump({
+            "metadata": metadata,
+            "index_config": index_config,
+            # Pre-validated, pre-serialized /recommend items
+            "fragments": build_fragments(metadata),
+            "fragment_version": FRAGMENT_VERSION,
+        }, f)
 
 
 if __name__ == "__main__":
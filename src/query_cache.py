@@ -0,0 +1,133 @@
+import os
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+# ============================================================
+# CACHE SETTINGS
+# ============================================================
+# Off by default: reused rankings can differ from fresh ones, so enable it
+# (e.g. QUERY_CACHE_SIZE=1024) once the threshold has been tuned on real traffic
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "0"))
+# Minimum cosine similarity between query embeddings to reuse a ranking
+QUERY_CACHE_THRESHOLD = float(os.getenv("QUERY_CACHE_THRESHOLD", "0.95"))
+# Fraction of hits that are re-ranked anyway to measure cache quality
+QUERY_CACHE_AUDIT_RATE = float(os.getenv("QUERY_CACHE_AUDIT_RATE", "0.05"))
+# Misses this close below the threshold are counted as near misses
+NEAR_MISS_MARGIN = 0.05
+
+
+class SemanticQueryCache:
+    """
+    Caches final rankings keyed by query embedding.
+
+    Past query embeddings live in a small FAISS index; a new query whose
+    nearest neighbour is within the cosine threshold reuses that ranking and
+    skips the cross-encoder. Entries are evicted least-recently-used.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = QUERY_CACHE_SIZE,
+        threshold: float = QUERY_CACHE_THRESHOLD,
+        audit_rate: float = QUERY_CACHE_AUDIT_RATE,
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+
+        self.index = faiss.IndexIDMap(faiss.IndexFlatIP(dimension))
+        self.entries: "OrderedDict[int, List[int]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.near_misses = 0
+        self.evictions = 0
+        self.hit_similarity_total = 0.0
+        self.audits = 0
+        self.audit_overlap_total = 0.0
+        self.audit_top1_mismatches = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def lookup(self, query_vec: np.ndarray) -> Optional[Tuple[int, List[int]]]:
+        """Returns (entry id, cached ranking) of the closest past query, if close enough."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self.lookups += 1
+            if not self.entries:
+                return None
+
+            similarities, ids = self.index.search(query_vec, 1)
+            similarity, entry_id = float(similarities[0][0]), int(ids[0][0])
+
+            if entry_id < 0 or similarity < self.threshold:
+                if similarity >= self.threshold - NEAR_MISS_MARGIN:
+                    self.near_misses += 1
+                return None
+
+            self.hits += 1
+            self.hit_similarity_total += similarity
+            self.entries.move_to_end(entry_id)
+            return entry_id, self.entries[entry_id]
+
+    def insert(self, query_vec: np.ndarray, ranking: List[int]):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(query_vec, np.array([entry_id], dtype=np.int64))
+            self.entries[entry_id] = list(ranking)
+
+            while len(self.entries) > self.capacity:
+                oldest, _ = self.entries.popitem(last=False)
+                self.index.remove_ids(np.array([oldest], dtype=np.int64))
+                self.evictions += 1
+
+    def should_audit(self) -> bool:
+        return random.random() < self.audit_rate
+
+    def record_audit(self, entry_id: int, cached: List[int], fresh: List[int], top_k: int):
+        """Compares a cached ranking against a freshly computed one and keeps the fresh one."""
+        with self._lock:
+            # Refresh the entry so a stale ranking is not served again
+            if entry_id in self.entries:
+                self.entries[entry_id] = list(fresh)
+
+            cached, fresh = cached[:top_k], fresh[:top_k]
+            if not fresh:
+                return
+            self.audits += 1
+            self.audit_overlap_total += len(set(cached) & set(fresh)) / len(fresh)
+            if not cached or cached[0] != fresh[0]:
+                self.audit_top1_mismatches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self.entries),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "near_misses": self.near_misses,
+                "evictions": self.evictions,
+                "mean_hit_similarity": self.hit_similarity_total / self.hits if self.hits else None,
+                "audits": self.audits,
+                "mean_audit_overlap": self.audit_overlap_total / self.audits if self.audits else None,
+                "audit_top1_mismatches": self.audit_top1_mismatches,
+            }
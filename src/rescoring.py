@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+
+# Compressed indexes return RESCORE_FACTOR x more candidates, which are then
+# re-scored exactly against the float32 embeddings.
+RESCORE_FACTOR = 4
+
+
+def full_embeddings_path(vector_db_path: str) -> str:
+    """Sidecar file holding the exact float32 embeddings used for re-scoring."""
+    return os.path.splitext(vector_db_path)[0] + ".f32.npy"
+
+
+def rescore_shortlist(full_embeddings: np.ndarray, query_vec: np.ndarray, shortlist: np.ndarray, top_k: int) -> np.ndarray:
+    """Re-ranks a compressed-index shortlist with exact float32 inner products."""
+    shortlist = shortlist[shortlist >= 0]
+    if shortlist.size == 0:
+        return shortlist
+
+    # Sorted row access keeps reads from a memory-mapped file sequential
+    rows = np.sort(shortlist)
+    exact = np.asarray(full_embeddings[rows], dtype=np.float32) @ query_vec.astype(np.float32)
+    order = np.argsort(-exact)[:top_k]
+    return rows[order]
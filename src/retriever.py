@@ -1,12 +1,18 @@
 import faiss
 import pickle
 import os
+import sys
 import torch
 import numpy as np
 from sentence_transformers import SentenceTransformer, CrossEncoder
 from typing import List, Dict, Any
 import logging
 
+from autotune import load_profile
+from query_cache import SemanticQueryCache
+from rescoring import RESCORE_FACTOR, rescore_shortlist
+from serialization import FRAGMENT_VERSION, build_fragments, build_response_item, dumps, format_result
+
 # ============================================================
 # DYNAMIC PATH SETUP (Critical for Cloud Deployment)
 # ============================================================
@@ -20,34 +26,133 @@ DEFAULT_METADATA = os.path.join(PROJECT_ROOT, "metadata.pkl")
 RETRIEVER_MODEL_NAME = "all-mpnet-base-v2"
 RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
+# Candidates handed to the cross-encoder
+CANDIDATE_POOL = 30
+
+MODEL_NAMES = (RETRIEVER_MODEL_NAME, RERANKER_MODEL_NAME)
+
+
+def load_models(device: str = None):
+    """Loads the bi-encoder and cross-encoder once so several catalogs can share them."""
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    logging.info(f"🖥️ Using device: {device}")
+    retriever = SentenceTransformer(RETRIEVER_MODEL_NAME, device=device)
+    reranker = CrossEncoder(RERANKER_MODEL_NAME, device=device)
+    return retriever, reranker
+
+
+def _metadata_bytes(metadata: List[Dict[str, Any]]) -> int:
+    """Approximate heap size of the metadata list: each dict plus its values (one level deep)."""
+    size = sys.getsizeof(metadata)
+    for doc in metadata:
+        size += sys.getsizeof(doc)
+        for value in doc.values():
+            size += sys.getsizeof(value)
+            if isinstance(value, list):
+                size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
 class IntelligentSearcher:
-    def __init__(self):
-        self.vector_db_path = DEFAULT_VECTOR_DB
-        self.metadata_path = DEFAULT_METADATA
+    def __init__(
+        self,
+        vector_db_path: str = DEFAULT_VECTOR_DB,
+        metadata_path: str = DEFAULT_METADATA,
+        retriever: SentenceTransformer = None,
+        reranker: CrossEncoder = None,
+        profile: Dict[str, Any] = None,
+    ):
+        self.vector_db_path = vector_db_path
+        self.metadata_path = metadata_path
 
         # Robust check for data files in the root
         if not os.path.exists(self.vector_db_path) or not os.path.exists(self.metadata_path):
-            logging.error(f"❌ Data files missing at: {PROJECT_ROOT}")
+            logging.error(f"❌ Data files missing at: {os.path.dirname(self.vector_db_path)}")
             logging.info(f"Searched for: {self.vector_db_path}")
-            raise FileNotFoundError("vector_store.faiss or metadata.pkl missing from root.")
+            raise FileNotFoundError(
+                f"{os.path.basename(self.vector_db_path)} or {os.path.basename(self.metadata_path)} missing."
+            )
 
         logging.info(f"✅ Loading metadata from {self.metadata_path}")
         with open(self.metadata_path, "rb") as f:
             # Assumes your pickle file structure is {'metadata': [...]}
             data = pickle.load(f)
             self.metadata = data["metadata"] if isinstance(data, dict) else data
+            self.index_config = data.get("index_config", {}) if isinstance(data, dict) else {}
+            fragments = data.get("fragments") if isinstance(data, dict) else None
+            fragment_version = data.get("fragment_version") if isinstance(data, dict) else None
+
+        # Pre-serialized /recommend items; older or stale metadata files get them rebuilt here
+        if (
+            fragments is None
+            or fragment_version != FRAGMENT_VERSION
+            or len(fragments) != len(self.metadata)
+        ):
+            fragments = build_fragments(self.metadata)
+        self.fragments = fragments
+        self._projected_fragments: Dict[tuple, List[Any]] = {}
 
         logging.info(f"✅ Loading FAISS index from {self.vector_db_path}")
         self.index = faiss.read_index(self.vector_db_path)
 
-        # Set device (Render Free Tier will use CPU automatically)
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logging.info(f"🖥️ Using device: {self.device}")
-        
-        self.retriever = SentenceTransformer(RETRIEVER_MODEL_NAME, device=self.device)
-        self.reranker = CrossEncoder(RERANKER_MODEL_NAME, device=self.device)
+        # Compressed indexes (PCA / fp16 / int8) carry their projection inside the
+        # index; the float32 embeddings are memory-mapped for exact re-scoring.
+        self.full_embeddings = None
+        if self.index_config.get("rescore"):
+            embeddings_path = os.path.join(
+                os.path.dirname(self.vector_db_path),
+                self.index_config["full_embeddings"]
+            )
+            logging.info(
+                f"✅ Compressed index (dim={self.index_config.get('pca_dim')}, "
+                f"dtype={self.index_config.get('dtype')}), re-scoring from {embeddings_path}"
+            )
+            self.full_embeddings = np.load(embeddings_path, mmap_mode="r")
+
+        # In-memory size (index + loaded metadata + fragments), measured once for the
+        # registry's byte budget. The re-score sidecar is memory-mapped and paged in on
+        # demand by the OS, so it is reported separately and not charged to the budget.
+        self.nbytes = (
+            len(faiss.serialize_index(self.index))
+            + _metadata_bytes(self.metadata)
+            + sum(len(f) for f in self.fragments if f is not None)
+        )
+        self.mapped_bytes = self.full_embeddings.nbytes if self.full_embeddings is not None else 0
+
+        # Models are shared when a registry serves several catalogs.
+        # Render Free Tier will use CPU automatically.
+        if retriever is None or reranker is None:
+            retriever, reranker = load_models()
+        self.retriever = retriever
+        self.reranker = reranker
+        self.device = str(self.retriever.device)
+
+        # Rerank batch size chosen by the autotuner; thread counts are applied once per process (see autotune.py)
+        if profile is None:
+            profile = load_profile(MODEL_NAMES)
+        self.tuning = profile.get("models", {}) if profile else {}
+
+        # Per-catalog cache of recent query embeddings and their rankings
+        self.query_cache = SemanticQueryCache(self.retriever.get_sentence_embedding_dimension())
+
+    def _batch_size(self, model: str) -> int:
+        return self.tuning.get(model, {}).get("batch_size", 32)
+
+    def _retrieve_candidates(self, query_vec: np.ndarray) -> np.ndarray:
+        if self.full_embeddings is None:
+            _, indices = self.index.search(query_vec, CANDIDATE_POOL)
+            return indices[0]
+
+        # Over-fetch from the compressed index, then keep the exact top candidates
+        _, shortlist = self.index.search(query_vec, CANDIDATE_POOL * RESCORE_FACTOR)
+        return rescore_shortlist(self.full_embeddings, query_vec[0], shortlist[0], CANDIDATE_POOL)
 
     def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        # 3. Final Output Formatting
+        return [format_result(self.metadata[idx]) for idx in self.search_ids(query, top_k)]
+
+    def search_ids(self, query: str, top_k: int = 10) -> List[int]:
+        """Returns metadata indices of the top_k results, best first."""
         # 1. Retriever: Vector Search (FAISS)
         query_vec = self.retriever.encode(
             [query],
@@ -55,11 +160,47 @@ class IntelligentSearcher:
             normalize_embeddings=True
         )
 
+        # Near-duplicate queries reuse a cached ranking and skip the cross-encoder
+        hit = self.query_cache.lookup(query_vec)
+        if hit is not None and not self.query_cache.should_audit():
+            ranking = hit[1]
+        else:
+            ranking = self._rank(query, query_vec)
+            if hit is None:
+                self.query_cache.insert(query_vec, ranking)
+            else:
+                entry_id, cached = hit
+                self.query_cache.record_audit(entry_id, cached, ranking, top_k)
+
+        return ranking[:top_k]
+
+    def render(self, ids: List[int], fields: tuple = None) -> List[bytes]:
+        """Returns the pre-serialized JSON of each result, optionally projected to some fields."""
+        if fields is None:
+            fragments = self.fragments
+        else:
+            fragments = self._projected_fragments.get(fields)
+            if fragments is None:
+                fragments = [None] * len(self.metadata)
+                self._projected_fragments[fields] = fragments
+
+        rendered = []
+        for idx in ids:
+            fragment = fragments[idx]
+            if fragment is None and fields is not None and self.fragments[idx] is not None:
+                item = build_response_item(self.metadata[idx])
+                fragment = fragments[idx] = dumps({f: item[f] for f in fields})
+            if fragment is not None:
+                rendered.append(fragment)
+        return rendered
+
+    def _rank(self, query: str, query_vec: np.ndarray) -> List[int]:
+        """Returns metadata indices of the candidates, best re-ranker score first."""
         # Retrieve 30 candidates for better re-ranking precision
-        _, indices = self.index.search(query_vec, 30)
+        candidate_ids = self._retrieve_candidates(query_vec)
 
         candidates = []
-        for idx in indices[0]:
+        for idx in candidate_ids:
             if 0 <= idx < len(self.metadata):
                 item = self.metadata[idx]
                 
@@ -74,44 +215,18 @@ class IntelligentSearcher:
                     f"Level: {job_lvl}\n"
                     f"Description: {item['description']}"
                 )
-                candidates.append({"doc": item, "text": rich_text})
+                candidates.append({"idx": int(idx), "text": rich_text})
 
         if not candidates:
             return []
 
         # 2. Re-ranker: Cross-Encoder (MS-MARCO) for Recall@K optimization
         pairs = [[query, c["text"]] for c in candidates]
-        scores = self.reranker.predict(pairs)
+        scores = self.reranker.predict(pairs, batch_size=self._batch_size("reranker"))
 
         for i, score in enumerate(scores):
             candidates[i]["score"] = float(score)
 
         # Sort by re-ranker score
         candidates.sort(key=lambda x: x["score"], reverse=True)
-        selected = candidates[:top_k]
-
-        # 3. Final Output Formatting
-        results = []
-        for cand in selected:
-            doc = cand["doc"]
-            
-            # Clean duration field
-            duration = doc.get("duration", 45)
-            if not isinstance(duration, int):
-                try:
-                    duration = int(str(duration).lower().replace("mins", "").strip())
-                except:
-                    duration = 45
-
-            results.append({
-                "url": doc.get("url", ""),
-                "name": doc.get("name", "Unknown Assessment"),
-                "description": doc.get("description", "")[:600], # Trimmed for UI
-                "duration": duration,
-                "job_levels": doc.get("job_levels", "All Levels"),
-                "test_type": doc.get("test_type", []),
-                "remote_support": doc.get("remote_support", "Yes"),
-                "adaptive_support": doc.get("adaptive_support", "No")
-            })
-
-        return results
\ No newline at end of file
+        return [c["idx"] for c in candidates]
@@ -0,0 +1,132 @@
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+# ============================================================
+# RESPONSE SCHEMA (Strictly matching Appendix 2 & OAS 3.1)
+# ============================================================
+class AssessmentItem(BaseModel):
+    url: str               #
+    name: str              #
+    adaptive_support: str  #  - Either "Yes" or "No"
+    description: str       #
+    duration: int          #  - Integer
+    remote_support: str    #  - Either "Yes" or "No"
+    test_type: List[str]   #  - Array of Strings
+
+class ProjectedAssessmentItem(BaseModel):
+    """AssessmentItem restricted by ?fields=...; only the requested keys are present."""
+    url: Optional[str] = None
+    name: Optional[str] = None
+    adaptive_support: Optional[str] = None
+    description: Optional[str] = None
+    duration: Optional[int] = None
+    remote_support: Optional[str] = None
+    test_type: Optional[List[str]] = None
+
+RESPONSE_FIELDS = ("url", "name", "adaptive_support", "description", "duration", "remote_support", "test_type")
+
+# Bump whenever cleaning or the schema changes so stored fragments are rebuilt
+FRAGMENT_VERSION = 1
+
+DURATION_PATTERN = re.compile(r"Time in minutes\s*=\s*(\d+)", re.I)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def to_yes_no(val) -> str:
+    if str(val).lower() in ['yes', 'true', '1']: return "Yes"
+    return "No"
+
+
+def format_result(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Turns a metadata entry into a search result."""
+    # Clean duration field
+    duration = doc.get("duration", 45)
+    if not isinstance(duration, int):
+        try:
+            duration = int(str(duration).lower().replace("mins", "").strip())
+        except:
+            duration = 45
+
+    return {
+        "url": doc.get("url", ""),
+        "name": doc.get("name", "Unknown Assessment"),
+        "description": doc.get("description", "")[:600], # Trimmed for UI
+        "duration": duration,
+        "job_levels": doc.get("job_levels", "All Levels"),
+        "test_type": doc.get("test_type", []),
+        "remote_support": doc.get("remote_support", "Yes"),
+        "adaptive_support": doc.get("adaptive_support", "No")
+    }
+
+
+def clean_assessment_data(item: dict) -> dict:
+    """Standardizes response fields to match SHL requirements exactly."""
+    raw_desc = item.get("description", "") or ""
+
+    # Extract duration as Integer
+    duration_match = DURATION_PATTERN.search(raw_desc)
+    duration = int(duration_match.group(1)) if duration_match else int(item.get("duration", 45))
+
+    return {
+        "url": item.get("url", ""),
+        "name": item.get("name", "Assessment"),
+        "adaptive_support": to_yes_no(item.get("adaptive_support", "No")),
+        "description": raw_desc.strip(),
+        "duration": duration,
+        "remote_support": to_yes_no(item.get("remote_support", "Yes")),
+        "test_type": item.get("test_type", ["Knowledge & Skills"])
+    }
+
+
+# ============================================================
+# PRE-SERIALIZED FRAGMENTS
+# ============================================================
+def build_response_item(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Cleans and validates one document, or returns None if it cannot be served."""
+    try:
+        item = clean_assessment_data(format_result(doc))
+        AssessmentItem(**item)
+        return item
+    except Exception as e:
+        logging.warning(f"⚠️ Skipping unservable document {doc.get('url')}: {e}")
+        return None
+
+
+def build_fragments(metadata: Sequence[Dict[str, Any]]) -> List[Optional[bytes]]:
+    """Per-document JSON for /recommend, built once at index or load time."""
+    fragments = []
+    for doc in metadata:
+        item = build_response_item(doc)
+        fragments.append(dumps(item) if item is not None else None)
+    return fragments
+
+
+def normalize_fields(fields: Optional[str]) -> Optional[tuple]:
+    """Parses a comma-separated projection into schema order; None means all fields."""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    projected = tuple(f for f in RESPONSE_FIELDS if f in requested)
+    return None if len(projected) == len(RESPONSE_FIELDS) else projected
+
+
+def join_array(key: str, fragments: Sequence[bytes]) -> bytes:
+    """Builds {"key": [fragment, ...]} without re-encoding the fragments."""
+    return b'{"' + key.encode("utf-8") + b'":[' + b",".join(fragments) + b"]}"
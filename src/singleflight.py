@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation.
+
+    The first caller for a key starts the work on a small dedicated pool; callers
+    arriving while it runs await the same future and get the same result or
+    exception. A cancelled caller only stops waiting: the computation keeps
+    running for the others. Must be used from a single event loop.
+
+    The pool is deliberately small (1 worker for CPU inference): each model
+    call already uses the tuned intra-op threads, so running several at once
+    would oversubscribe the cores.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.cancelled_waiters = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is None:
+            self.executions += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._finish, key))
+        else:
+            self.coalesced += 1
+
+        try:
+            # shield: cancelling one waiter must not cancel the shared computation
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.cancelled_waiters += 1
+            raise
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.cancelled():
+            return
+        # Retrieving the exception also stops asyncio warning when every waiter was cancelled
+        error = future.exception()
+        if error is not None:
+            self.errors += 1
+            logging.debug(f"Single-flight computation for {key!r} failed: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "cancelled_waiters": self.cancelled_waiters,
+        }